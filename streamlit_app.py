@@ -2,59 +2,169 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 
 st.set_page_config(page_title="기후안정 프로젝트 대시보드", layout="wide")
 
 # -------------------------------
 # 데이터 불러오기 (예시 + 더미 데이터)
 # -------------------------------
-@st.cache_data
+REGIONS = ["서울", "부산", "제주", "대전"]
+SEASONS = ["여름","겨울"]
+
 def load_temperature_data():
-    years = list(range(1900, 2025))
-    data = []
-    regions = ["서울", "부산", "제주", "대전"]
-    seasons = ["여름","겨울"]
-    for reg in regions:
-        for season in seasons:
-            base = 24.0 if season=="여름" else -1.5
-            for y in years:
-                temp = base + 0.02*(y - 1900) + np.random.normal(0,0.5)
-                data.append({"year": y, "region": reg, "season": season, "avg_temp": temp})
-    return pd.DataFrame(data)
-
-@st.cache_data
+    years = np.arange(1900, 2025, dtype=np.int16)
+    regions = np.array(REGIONS)
+    seasons = np.array(SEASONS)
+    base = np.where(seasons=="여름", 24.0, -1.5)
+    rng = np.random.default_rng(0)
+    # (지역, 계절, 연도) 순서로 한 번에 계산
+    noise = rng.standard_normal((len(regions),len(seasons),len(years)), dtype=np.float32)*0.5
+    temps = base[None,:,None] + 0.02*(years - 1900)[None,None,:] + noise
+    return pd.DataFrame({
+        "year": np.tile(years, len(regions)*len(seasons)),
+        "region": pd.Categorical(np.repeat(regions, len(seasons)*len(years)), categories=regions),
+        # 범례 순서(겨울, 여름)가 기존 정렬 groupby 결과와 같도록 가나다순으로 둠
+        "season": pd.Categorical(np.tile(np.repeat(seasons, len(years)), len(regions)), categories=np.sort(seasons)),
+        "avg_temp": temps.ravel().astype(np.float32),
+    })
+
 def load_emission_data():
-    years = list(range(1990, 2021))
-    emissions = np.linspace(400000, 700000, len(years)) + np.random.normal(0,20000, len(years))
+    years = np.arange(1990, 2021, dtype=np.int16)
+    rng = np.random.default_rng(1)
+    emissions = np.linspace(400000, 700000, len(years), dtype=np.float32) + rng.standard_normal(len(years), dtype=np.float32)*20000
     return pd.DataFrame({"year": years, "emissions": emissions})
 
-@st.cache_data
 def load_extreme_data():
-    years = list(range(1960, 2025))
-    heatwave = np.linspace(3, 25, len(years)) + np.random.normal(0,2,len(years))
-    coldwave = np.linspace(20, 4, len(years)) + np.random.normal(0,2,len(years))
+    years = np.arange(1960, 2025, dtype=np.int16)
+    rng = np.random.default_rng(2)
+    heatwave = np.linspace(3, 25, len(years), dtype=np.float32) + rng.standard_normal(len(years), dtype=np.float32)*2
+    coldwave = np.linspace(20, 4, len(years), dtype=np.float32) + rng.standard_normal(len(years), dtype=np.float32)*2
     return pd.DataFrame({"year": years, "heatwave_days": heatwave, "coldwave_days": coldwave})
 
-@st.cache_data
 def load_precipitation_data():
-    years = list(range(1900, 2025))
-    rainfall = np.linspace(900, 1400, len(years)) + np.random.normal(0,50,len(years))
+    years = np.arange(1900, 2025, dtype=np.int16)
+    rng = np.random.default_rng(3)
+    rainfall = np.linspace(900, 1400, len(years), dtype=np.float32) + rng.standard_normal(len(years), dtype=np.float32)*50
     return pd.DataFrame({"year": years, "rainfall": rainfall})
 
-@st.cache_data
 def load_sealevel_data():
-    years = list(range(1900, 2025))
-    sealevel = np.linspace(0, 25, len(years)) + np.random.normal(0,1,len(years))
+    years = np.arange(1900, 2025, dtype=np.int16)
+    rng = np.random.default_rng(4)
+    sealevel = np.linspace(0, 25, len(years), dtype=np.float32) + rng.standard_normal(len(years), dtype=np.float32)
     return pd.DataFrame({"year": years, "sealevel_rise_cm": sealevel})
 
+def rolling_mean(x, window=5):
+    # rolling(window, 1).mean()과 같은 결과를 누적합으로 O(N)에 계산 (2차원이면 열마다)
+    # NaN은 합과 개수에서 모두 빼서 pandas처럼 건너뜀
+    valid = ~np.isnan(x)
+    c = np.cumsum(np.where(valid, x, 0), axis=0, dtype=np.float64)
+    n = np.cumsum(valid, axis=0)
+    c[window:] = c[window:] - c[:-window]
+    n[window:] = n[window:] - n[:-window]
+    # 누적합만 float64로 하고 결과는 입력 dtype(float32)으로 되돌림
+    with np.errstate(invalid="ignore"):
+        return (c / n).astype(x.dtype, copy=False)
+
+# 프로세스당 한 번만 만들고 모든 세션이 공유 (읽기 전용으로 사용)
+# 선택된 카테고리의 그래프가 처음 그려질 때에야 만들어짐
+@st.cache_resource(show_spinner=False)
+def _temperature_datasets():
+    df_temp = load_temperature_data()
+    # 연도 × 계절 평균표와 (지역, 계절, 연도) 정렬 인덱스는 미리 한 번만 계산
+    season_mean = df_temp.groupby(["season","year"], observed=True)["avg_temp"].mean().unstack("season")
+    return {
+        "season_mean": season_mean,
+        # 5년 이동평균은 전체 기간에 대해 한 번만 계산하고 토글로 표만 바꿔 씀
+        "season_mean_ma5": pd.DataFrame(rolling_mean(season_mean.to_numpy()), index=season_mean.index, columns=season_mean.columns),
+        # 지역 상세 차트는 기존처럼 데이터 순서(여름, 겨울)로 트레이스가 나오도록 계절 순서를 SEASONS로 둠
+        "by_region": df_temp.assign(season=df_temp["season"].cat.reorder_categories(SEASONS)).set_index(["region","season","year"]).sort_index(),
+    }
+
+@st.cache_resource(show_spinner=False)
+def _yearly_dataset():
+    # 연도 단위 지표는 연도 인덱스 하나의 넓은 프레임으로 합침 (없는 연도는 NaN)
+    # 연속된 RangeIndex라서 .loc[lo:hi]가 단순 정수 계산으로 잘림
+    df_emission = load_emission_data()
+    df_emission["emissions_ma5"] = rolling_mean(df_emission["emissions"].to_numpy())
+    frames = [df.set_index("year") for df in (df_emission, load_extreme_data(), load_precipitation_data(), load_sealevel_data())]
+    return pd.concat(frames, axis=1).reindex(pd.RangeIndex(1900, 2025, name="year"))
+
+# -------------------------------
+# 그래프 도우미
+# -------------------------------
+def line_by_group(df, x, y, group, markers):
+    # px.line(color=...) 대신 그룹별 WebGL 트레이스를 직접 추가
+    fig = go.Figure()
+    for name, sub in df.groupby(group, observed=True, sort=False):
+        fig.add_trace(go.Scattergl(
+            x=sub[x].to_numpy(), y=sub[y].to_numpy(), name=name,
+            mode="lines+markers" if markers else "lines",
+        ))
+    fig.update_layout(xaxis_title=x, yaxis_title=y, legend_title_text=group)
+    return fig
+
 # -------------------------------
-# 데이터 준비
+# 그래프 만들기 (입력값 조합별로 Figure 캐싱)
 # -------------------------------
-df_temp = load_temperature_data()
-df_emission = load_emission_data()
-df_extreme = load_extreme_data()
-df_precip = load_precipitation_data()
-df_sealevel = load_sealevel_data()
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_temp_fig(lo, hi, graph_type, markers, logy, ma):
+    df_wide = _temperature_datasets()["season_mean_ma5" if ma else "season_mean"].loc[lo:hi]
+    df_grouped = df_wide.reset_index().melt("year", var_name="season", value_name="avg_temp")
+    if graph_type=="꺾은선(line)":
+        fig = line_by_group(df_grouped, "year", "avg_temp", "season", markers)
+    elif graph_type=="영역(area)":
+        fig = px.area(df_grouped, x="year", y="avg_temp", color="season")
+    else:
+        fig = px.bar(df_grouped, x="year", y="avg_temp", color="season")
+    if logy:
+        fig.update_yaxes(type="log")
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_region_fig(region, lo, hi, markers):
+    df_reg = (
+        _temperature_datasets()["by_region"].xs(region, level="region")
+        .loc[(slice(None), slice(lo, hi)), :]
+        .reset_index()
+    )
+    return line_by_group(df_reg, "year", "avg_temp", "season", markers)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_emission_fig(lo, hi, graph_type, markers, logy, ma):
+    y_col = "emissions_ma5" if ma else "emissions"
+    df_em = _yearly_dataset().loc[lo:hi, [y_col]].dropna().rename(columns={y_col: "emissions"}).reset_index()
+    if graph_type=="꺾은선(line)":
+        fig = px.line(df_em, x="year", y="emissions", markers=markers, render_mode="webgl")
+    elif graph_type=="영역(area)":
+        fig = px.area(df_em, x="year", y="emissions")
+    else:
+        fig = px.bar(df_em, x="year", y="emissions")
+    if logy:
+        fig.update_yaxes(type="log")
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_extreme_fig(lo, hi, markers):
+    cols = ["heatwave_days","coldwave_days"]
+    df_ex = _yearly_dataset().loc[lo:hi, cols].dropna()
+    # px의 wide-form(melt 후 다시 트레이스로 분리) 대신 열마다 트레이스를 직접 생성
+    fig = go.Figure([
+        go.Scattergl(x=df_ex.index.to_numpy(), y=df_ex[c].to_numpy(), name=c, mode="lines+markers" if markers else "lines")
+        for c in cols
+    ])
+    fig.update_layout(xaxis_title="year", yaxis_title="value", legend_title_text="variable")
+    return fig
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_precip_fig(lo, hi, markers):
+    df_p = _yearly_dataset().loc[lo:hi, ["rainfall"]].dropna().reset_index()
+    return px.line(df_p, x="year", y="rainfall", markers=markers, render_mode="webgl")
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_sealevel_fig(lo, hi, markers):
+    df_s = _yearly_dataset().loc[lo:hi, ["sealevel_rise_cm"]].dropna().reset_index()
+    return px.line(df_s, x="year", y="sealevel_rise_cm", markers=markers, render_mode="webgl")
 
 # -------------------------------
 # 사이드바 옵션
@@ -83,7 +193,7 @@ show_markers = st.sidebar.checkbox("마커 표시", True)
 use_log = st.sidebar.checkbox("로그 스케일 적용 (y축)", False)
 show_ma = st.sidebar.checkbox("이동평균선(5년) 표시", False)
 
-region_select = st.sidebar.selectbox("지역 선택 (상세 분석)", df_temp["region"].unique().tolist())
+region_select = st.sidebar.selectbox("지역 선택 (상세 분석)", REGIONS)
 
 # -------------------------------
 # 본문 레이아웃
@@ -96,23 +206,11 @@ st.write(f"선택된 기간: {year_range[0]}년 ~ {year_range[1]}년")
 # -------------------------------
 if "계절별 평균기온" in categories:
     st.subheader("📈 계절별 평균기온 변화")
-    df_temp_filtered = df_temp[(df_temp["year"] >= year_range[0]) & (df_temp["year"] <= year_range[1])]
-    df_grouped = df_temp_filtered.groupby(["year","season"])["avg_temp"].mean().reset_index()
-    if show_ma:
-        df_grouped["avg_temp"] = df_grouped.groupby("season")["avg_temp"].transform(lambda x: x.rolling(5,1).mean())
-    if graph_type=="꺾은선(line)":
-        fig = px.line(df_grouped, x="year", y="avg_temp", color="season", markers=show_markers)
-    elif graph_type=="영역(area)":
-        fig = px.area(df_grouped, x="year", y="avg_temp", color="season")
-    else:
-        fig = px.bar(df_grouped, x="year", y="avg_temp", color="season")
-    if use_log:
-        fig.update_yaxes(type="log")
+    fig = build_temp_fig(*year_range, graph_type, show_markers, use_log, show_ma)
     st.plotly_chart(fig, use_container_width=True)
 
     st.subheader(f"📍 {region_select} 지역 상세 기온 변화")
-    df_reg = df_temp_filtered[df_temp_filtered["region"] == region_select]
-    fig_reg = px.line(df_reg, x="year", y="avg_temp", color="season", markers=show_markers)
+    fig_reg = build_region_fig(region_select, *year_range, show_markers)
     st.plotly_chart(fig_reg, use_container_width=True)
 
 # -------------------------------
@@ -120,17 +218,7 @@ if "계절별 평균기온" in categories:
 # -------------------------------
 if "온실가스 배출량" in categories:
     st.subheader("🧪 한국 온실가스 배출량 변화 (CO₂ eq.)")
-    df_em = df_emission[(df_emission["year"] >= year_range[0]) & (df_emission["year"] <= year_range[1])]
-    if show_ma:
-        df_em["emissions"] = df_em["emissions"].rolling(5,1).mean()
-    if graph_type=="꺾은선(line)":
-        fig_em = px.line(df_em, x="year", y="emissions", markers=show_markers)
-    elif graph_type=="영역(area)":
-        fig_em = px.area(df_em, x="year", y="emissions")
-    else:
-        fig_em = px.bar(df_em, x="year", y="emissions")
-    if use_log:
-        fig_em.update_yaxes(type="log")
+    fig_em = build_emission_fig(*year_range, graph_type, show_markers, use_log, show_ma)
     st.plotly_chart(fig_em, use_container_width=True)
 
 # -------------------------------
@@ -138,8 +226,7 @@ if "온실가스 배출량" in categories:
 # -------------------------------
 if "폭염/한파 발생 일수" in categories:
     st.subheader("☀️🌨 폭염/한파 발생 일수")
-    df_ex = df_extreme[(df_extreme["year"] >= year_range[0]) & (df_extreme["year"] <= year_range[1])]
-    fig_ext = px.line(df_ex, x="year", y=["heatwave_days","coldwave_days"], markers=show_markers)
+    fig_ext = build_extreme_fig(*year_range, show_markers)
     st.plotly_chart(fig_ext, use_container_width=True)
 
 # -------------------------------
@@ -147,8 +234,7 @@ if "폭염/한파 발생 일수" in categories:
 # -------------------------------
 if "강수량" in categories:
     st.subheader("🌧 연간 강수량 변화")
-    df_p = df_precip[(df_precip["year"] >= year_range[0]) & (df_precip["year"] <= year_range[1])]
-    fig_p = px.line(df_p, x="year", y="rainfall", markers=show_markers)
+    fig_p = build_precip_fig(*year_range, show_markers)
     st.plotly_chart(fig_p, use_container_width=True)
 
 # -------------------------------
@@ -156,8 +242,7 @@ if "강수량" in categories:
 # -------------------------------
 if "해수면 상승" in categories:
     st.subheader("🌊 해수면 상승 (cm)")
-    df_s = df_sealevel[(df_sealevel["year"] >= year_range[0]) & (df_sealevel["year"] <= year_range[1])]
-    fig_s = px.line(df_s, x="year", y="sealevel_rise_cm", markers=show_markers)
+    fig_s = build_sealevel_fig(*year_range, show_markers)
     st.plotly_chart(fig_s, use_container_width=True)
 
 # -------------------------------